@@ -1,9 +1,14 @@
+import hashlib
 import os
+import threading
+import time
 from typing import Optional, List, Dict, Any
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from jwt.exceptions import PyJWTError
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
 
 # Clerk JWT verification settings
 CLERK_PEM_PUBLIC_KEY = os.getenv("CLERK_PEM_PUBLIC_KEY", "")
@@ -12,9 +17,30 @@ CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL", "")
 if not CLERK_PEM_PUBLIC_KEY and not CLERK_JWKS_URL:
     raise ValueError("Either CLERK_PEM_PUBLIC_KEY or CLERK_JWKS_URL must be set")
 
+# Parse the PEM public key once at import time. Passing the raw PEM string to
+# jwt.decode() makes PyJWT re-parse it through cryptography on every request,
+# which is expensive on the RS256 hot path.
+try:
+    _clerk_public_key = load_pem_public_key(CLERK_PEM_PUBLIC_KEY.encode()) if CLERK_PEM_PUBLIC_KEY else None
+except ValueError:
+    # Malformed key at import time - fall back to lazy parsing on first use
+    _clerk_public_key = None
+
+# Module-level JWKS client so signing keys are fetched at most once per
+# rotation window instead of once per request. PyJWKClient caches keys
+# internally and refetches on a kid miss.
+_jwks_client = jwt.PyJWKClient(CLERK_JWKS_URL, cache_keys=True, lifespan=300) if CLERK_JWKS_URL else None
+
 # Security scheme for JWT authentication
 security = HTTPBearer()
 
+# Short-lived cache of verified token payloads. The same token is presented
+# many times per session, so skipping the RSA signature check for a few
+# seconds is a large throughput win. Keyed by a token digest so the cache
+# never stores raw tokens.
+_token_cache = TTLCache(maxsize=4096, ttl=5)
+_token_cache_lock = threading.Lock()
+
 def verify_jwt_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
@@ -22,25 +48,46 @@ def verify_jwt_token(
     Verify JWT token from Clerk.
     Returns the decoded token if valid.
     """
+    global _clerk_public_key
     token = credentials.credentials
+
+    # Return a recently verified payload without re-running RSA verification
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+    if cached is not None and cached.get("exp", float("inf")) > time.time():
+        return cached
+
     try:
         # Use public key if available
         if CLERK_PEM_PUBLIC_KEY:
+            # Re-parse lazily if the import-time parse did not happen
+            if _clerk_public_key is None:
+                _clerk_public_key = load_pem_public_key(CLERK_PEM_PUBLIC_KEY.encode())
             payload = jwt.decode(
                 token,
-                CLERK_PEM_PUBLIC_KEY,
+                _clerk_public_key,
                 algorithms=["RS256"],
                 audience="YOUR_AUDIENCE",  # Set this to your API audience
                 options={"verify_aud": False},  # Set to True in production with correct audience
             )
         # Otherwise use JWKS URL
         else:
-            # Note: For production, you should implement JWKS support
-            # This is simplified for example purposes
-            raise NotImplementedError("JWKS URL support not implemented in this example")
-        
+            signing_key = _jwks_client.get_signing_key_from_jwt(token).key
+            payload = jwt.decode(
+                token,
+                signing_key,
+                algorithms=["RS256"],
+                audience="YOUR_AUDIENCE",  # Set this to your API audience
+                options={"verify_aud": False},  # Set to True in production with correct audience
+            )
+
+        with _token_cache_lock:
+            _token_cache[cache_key] = payload
         return payload
     except PyJWTError as e:
+        with _token_cache_lock:
+            _token_cache.pop(cache_key, None)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid authentication credentials: {str(e)}",
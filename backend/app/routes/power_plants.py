@@ -1,7 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends, Response
 from typing import List, Optional, Dict, Any
 from io import BytesIO
+from cachetools import TTLCache
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import os
 from botocore.exceptions import ClientError
 import boto3
@@ -9,14 +14,22 @@ from minio import Minio
 import traceback
 
 from app.models import PowerPlant
-from app.services import get_s3_client, get_data_from_s3, S3_BUCKET_NAME
+from app import services
+from app.services import get_s3_client, get_data_from_s3, plants_by_state, S3_BUCKET_NAME
 from app.utils.data_cleaner import clean_csv_data, clean_excel_data, convert_to_api_format
 from app.utils.logger import logger, log_audit
 
 router = APIRouter(prefix="/api/power-plants", tags=["power-plants"])
 
-# In-memory cache for available states
-states_cache = None
+# In-memory cache for available states, tied to the data cache timestamp it
+# was computed from. A mutable container rather than rebindable module
+# globals, so scripts and other modules can update it in place and the
+# running app actually sees the change.
+STATES_CACHE = {"states": None, "timestamp": None}
+
+# Serialized response bodies for the plants endpoint, keyed by
+# (data version, state, limit); cleared on upload
+plants_response_cache = TTLCache(maxsize=512, ttl=300)
 
 @router.post("/upload")
 async def upload_csv(
@@ -34,16 +47,15 @@ async def upload_csv(
         raise HTTPException(status_code=400, detail="Only CSV and Excel files are supported")
     
     try:
-        contents = await file.read()
-        logger.debug(f"Read file contents: {file.filename} ({len(contents)} bytes)")
-        
-        # Clean and process the file data
+        # Parse straight from the upload's spooled temp file instead of
+        # reading the whole payload into one bytes object first; pandas
+        # streams from disk once the spool threshold is exceeded
         if file.filename.endswith('.csv'):
             logger.info(f"Processing CSV file: {file.filename}")
-            df = clean_csv_data(contents)
+            df = clean_csv_data(file.file)
         else:
             logger.info(f"Processing Excel file: {file.filename}")
-            df = clean_excel_data(contents)
+            df = clean_excel_data(file.file)
         
         # Convert to API format
         logger.debug("Converting data to API format")
@@ -56,15 +68,16 @@ async def upload_csv(
                 detail="Could not extract required data from the file. Ensure it has the necessary columns."
             )
         
-        # Write cleaned data to a buffer
-        buffer = BytesIO()
-        api_df.to_csv(buffer, index=False)
-        buffer.seek(0)
-        
+        # Serialize with pyarrow's CSV writer into a single arrow buffer;
+        # BufferReader gives both clients a zero-copy stream over it
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(pa.Table.from_pandas(api_df, preserve_index=False), sink)
+        csv_buffer = sink.getvalue()
+
         # Object key for the file
         object_key = f"cleaned_{file.filename.rsplit('.', 1)[0]}.csv"
         logger.info(f"Uploading processed data to S3: {object_key}")
-        
+
         # Upload to S3 - handle different client types
         if isinstance(s3_client, Minio):
             # For MinIO client
@@ -72,8 +85,8 @@ async def upload_csv(
             s3_client.put_object(
                 bucket_name=S3_BUCKET_NAME,
                 object_name=object_key,
-                data=buffer,
-                length=buffer.getbuffer().nbytes,
+                data=pa.BufferReader(csv_buffer),
+                length=csv_buffer.size,
                 content_type='text/csv'
             )
         else:
@@ -82,13 +95,14 @@ async def upload_csv(
             s3_client.put_object(
                 Bucket=S3_BUCKET_NAME,
                 Key=object_key,
-                Body=buffer.getvalue()
+                Body=pa.BufferReader(csv_buffer)
             )
         
-        # Clear the cache to refresh data
-        logger.debug("Clearing states cache")
-        global states_cache
-        states_cache = None
+        # Clear the caches to refresh data
+        logger.debug("Clearing states and response caches")
+        STATES_CACHE["states"] = None
+        STATES_CACHE["timestamp"] = None
+        plants_response_cache.clear()
         
         logger.info(f"File uploaded successfully: {object_key} ({len(api_df)} records)")
         return {
@@ -113,38 +127,34 @@ async def get_states(
     Get list of all available states in the dataset.
     """
     logger.info("Fetching available states")
-    global states_cache
-    
+
     try:
         # Always fetch data to ensure we have the latest
         logger.debug("Fetching data from S3")
         data = await get_data_from_s3(s3_client)
-        
+
         if data.empty:
             logger.warning("No data found in S3")
             return []
-        
-        # Get unique states from the data
-        current_states = sorted(data["PSTATEABB"].unique().tolist())
-        
-        # Check if the states in the data match the cached states
-        if states_cache is not None:
-            cached_set = set(states_cache)
-            current_set = set(current_states)
-            
-            # If the sets are different, update the cache
-            if cached_set != current_set:
-                logger.info(f"States have changed. Updating cache from {states_cache} to {current_states}")
-                states_cache = current_states
-            else:
-                logger.debug("States match the cache")
+
+        # The states list only changes when the data does, so while the data
+        # cache timestamp is unchanged the cached list is still valid - no
+        # need to rescan the dataframe or compare sets
+        if STATES_CACHE["states"] is not None and STATES_CACHE["timestamp"] == services.data_cache_timestamp:
+            logger.debug("Returning states from cache")
+            return STATES_CACHE["states"]
+
+        # Recompute once per data refresh, preferring the precomputed
+        # per-state aggregation keys over a full column scan
+        if plants_by_state:
+            states = sorted(plants_by_state.keys())
         else:
-            # Initialize cache if it's None
-            logger.debug("Initializing states cache")
-            states_cache = current_states
-        
-        logger.info(f"Found {len(states_cache)} states: {', '.join(states_cache)}")
-        return states_cache
+            states = sorted(data["PSTATEABB"].unique().tolist())
+        STATES_CACHE["states"] = states
+        STATES_CACHE["timestamp"] = services.data_cache_timestamp
+
+        logger.info(f"Found {len(states)} states: {', '.join(states)}")
+        return states
         
     except Exception as e:
         logger.error(f"Error retrieving states: {str(e)}")
@@ -161,44 +171,74 @@ async def get_plants(
     Get top N power plants by net generation for a specific state.
     """
     logger.info(f"Fetching top {limit} power plants for state: {state}")
-    
+
     try:
         logger.debug("Fetching data from S3")
         data = await get_data_from_s3(s3_client)
         if data.empty:
             logger.warning("No data found in S3")
             return []
-        
-        # Filter by state and calculate totals for each plant
-        state_data = data[data["PSTATEABB"] == state]
-        
-        if state_data.empty:
-            logger.warning(f"No data found for state: {state}")
-            return []
-        
-        logger.debug(f"Found {len(state_data)} records for state: {state}")
-        
-        # Group by plant and sum the generation values
-        plant_totals = state_data.groupby(["ORISPL", "PNAME"]).agg({
-            "GENNTAN": "sum"
-        }).reset_index()
-        
-        # Sort by net generation (descending) and take top N
-        plant_totals = plant_totals.sort_values("GENNTAN", ascending=False).head(limit)
-        
-        # Convert to list of PowerPlant models
-        plants = [
-            PowerPlant(
-                id=str(row["ORISPL"]),
-                name=row["PNAME"],
-                state=state,
-                netGeneration=float(row["GENNTAN"])
-            )
-            for _, row in plant_totals.iterrows()
-        ]
-        
-        logger.info(f"Returning {len(plants)} power plants for state: {state}")
-        return plants
+
+        # Serve the serialized body straight from the response cache when the
+        # underlying data version is unchanged
+        data_version = services.data_cache_timestamp
+        if data_version is not None:
+            cached_body = plants_response_cache.get((data_version, state, limit))
+            if cached_body is not None:
+                logger.debug(f"Returning cached response for state: {state}")
+                return Response(content=cached_body, media_type="application/json")
+        
+        # Use the per-state aggregations precomputed at cache refresh
+        plant_totals = plants_by_state.get(state)
+        if plant_totals is not None:
+            # Already sorted by net generation (descending)
+            plant_totals = plant_totals.head(limit)
+        else:
+            if plants_by_state:
+                logger.warning(f"No data found for state: {state}")
+                return []
+
+            # Precomputed aggregations unavailable - aggregate on demand
+            state_data = data[data["PSTATEABB"] == state]
+
+            if state_data.empty:
+                logger.warning(f"No data found for state: {state}")
+                return []
+
+            logger.debug(f"Found {len(state_data)} records for state: {state}")
+
+            # Group by plant and sum the generation values
+            plant_totals = state_data.groupby(["ORISPL", "PNAME"]).agg({
+                "GENNTAN": "sum"
+            }).reset_index()
+
+            # Take the top N by net generation with argpartition: O(N)
+            # selection plus an O(limit log limit) sort of the winners,
+            # instead of sorting the whole group
+            vals = plant_totals["GENNTAN"].to_numpy()
+            k = min(limit, len(vals))
+            if k <= 0:
+                return []
+            idx = np.argpartition(-vals, k - 1)[:k]
+            idx = idx[np.argsort(-vals[idx])]
+            plant_totals = plant_totals.iloc[idx]
+        
+        # Convert to response records. Column-wise conversion plus
+        # to_dict(orient="records") avoids materializing a Series per row the
+        # way iterrows() does; the records already match the PowerPlant shape
+        # so the body is serialized once with orjson and cached.
+        records = (
+            plant_totals
+            .assign(ORISPL=plant_totals["ORISPL"].astype(str), state=state)
+            .rename(columns={"ORISPL": "id", "PNAME": "name", "GENNTAN": "netGeneration"})
+            .to_dict(orient="records")
+        )
+
+        logger.info(f"Returning {len(records)} power plants for state: {state}")
+        body = orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY)
+        if data_version is not None:
+            plants_response_cache[(data_version, state, limit)] = body
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Error retrieving plants for state {state}: {str(e)}")
         logger.error(traceback.format_exc())
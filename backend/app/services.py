@@ -2,7 +2,11 @@ import os
 import boto3
 from io import BytesIO
 import pandas as pd
-from typing import List, Dict, Any, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import csv as pacsv
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import Depends
 import asyncio
 from minio import Minio
@@ -19,12 +23,86 @@ S3_BUCKET_NAME = os.environ.get("S3_BUCKET_NAME", "power-viz")
 S3_USE_SSL = os.environ.get("S3_USE_SSL", "False").lower() == "true"
 
 # Export the bucket name for use in other modules
-__all__ = ['get_s3_client', 'get_data_from_s3', 'S3_BUCKET_NAME']
+__all__ = ['get_s3_client', 'get_data_from_s3', 'plants_by_state', 'S3_BUCKET_NAME']
 
 # Cache for the processed data
 data_cache = None
 data_cache_timestamp = None
 
+# Per-file cache keyed by object name -> (etag, DataFrame) so a refresh only
+# re-downloads and re-parses files whose ETag changed
+file_cache = {}
+
+# Precomputed per-state plant aggregations, rebuilt whenever the combined
+# data changes: state -> DataFrame(ORISPL, PNAME, GENNTAN) sorted descending.
+# Mutated in place so modules importing the name see updates.
+plants_by_state = {}
+
+
+def _rebuild_plants_by_state(combined_data: pd.DataFrame):
+    """
+    Rebuild the per-state plant aggregation lookup from the combined data.
+    """
+    aggregated = {
+        state: group.groupby(["ORISPL", "PNAME"], sort=False, observed=True)["GENNTAN"]
+        .sum()
+        .sort_values(ascending=False)
+        .reset_index()
+        for state, group in combined_data.groupby("PSTATEABB", observed=True)
+    }
+    plants_by_state.clear()
+    plants_by_state.update(aggregated)
+    logger.debug(f"Rebuilt per-state aggregations for {len(aggregated)} states")
+
+# On-disk parquet snapshot of the combined data so a cold process start can
+# reload the dataset without hitting S3 at all
+PARQUET_CACHE_PATH = Path(os.environ.get("DATA_CACHE_PATH", "cache/combined_data.parquet"))
+
+
+def _load_parquet_snapshot() -> Tuple[Optional[pd.DataFrame], Optional[pd.Timestamp]]:
+    """
+    Load the combined-data parquet snapshot from disk, if present.
+    Returns the dataframe and the snapshot's write time, or (None, None).
+    """
+    if not PARQUET_CACHE_PATH.exists():
+        return None, None
+    try:
+        table = pq.read_table(PARQUET_CACHE_PATH, memory_map=True)
+        snapshot_time = pd.Timestamp.fromtimestamp(PARQUET_CACHE_PATH.stat().st_mtime)
+        return table.to_pandas(), snapshot_time
+    except Exception as e:
+        logger.warning(f"Could not load parquet snapshot: {str(e)}")
+        return None, None
+
+
+def _write_parquet_snapshot(df: pd.DataFrame):
+    """
+    Persist the combined data to a parquet snapshot, replacing atomically.
+    """
+    try:
+        PARQUET_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = PARQUET_CACHE_PATH.with_suffix(".parquet.tmp")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        tmp_path.replace(PARQUET_CACHE_PATH)
+        logger.debug(f"Wrote parquet snapshot with {len(df)} rows")
+    except Exception as e:
+        logger.warning(f"Could not write parquet snapshot: {str(e)}")
+
+
+def _fetch_object_bytes(s3_client, file: str) -> bytes:
+    """
+    Download a single object's bytes using whichever client we were given.
+    """
+    if isinstance(s3_client, Minio):
+        response = s3_client.get_object(S3_BUCKET_NAME, file)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    obj = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=file)
+    return obj['Body'].read()
+
 def get_s3_client():
     """
     Returns an S3 client (boto3 or MinIO)
@@ -65,117 +143,162 @@ async def get_data_from_s3(s3_client) -> pd.DataFrame:
             log_audit("system", "READ", "data_cache", "SUCCESS", "Using cached data")
             return data_cache
     
+    # Cold start: reload the last combined snapshot from disk instead of
+    # re-downloading and re-parsing every CSV
+    if data_cache is None:
+        snapshot, snapshot_time = _load_parquet_snapshot()
+        if snapshot is not None and (current_time - snapshot_time).total_seconds() < 300:
+            logger.info(f"Loaded {len(snapshot)} rows from parquet snapshot")
+            log_audit("system", "READ", "parquet_snapshot", "SUCCESS", f"Loaded {len(snapshot)} rows")
+            data_cache = snapshot
+            data_cache_timestamp = snapshot_time
+            _rebuild_plants_by_state(snapshot)
+            return snapshot
+
     logger.info(f"Fetching data from S3 bucket: {S3_BUCKET_NAME}")
     log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "STARTED")
-    
-    # List all CSV files in the bucket
-    if isinstance(s3_client, Minio):
-        # MinIO client
-        try:
+
+    # List all CSV files in the bucket along with their ETags
+    try:
+        if isinstance(s3_client, Minio):
             logger.debug("Using MinIO client to list objects")
             objects = s3_client.list_objects(S3_BUCKET_NAME, recursive=True)
-            files = [obj.object_name for obj in objects if obj.object_name.endswith('.csv')]
-            logger.info(f"Found {len(files)} CSV files in the bucket")
-            
-            all_data = []
-            for file in files:
-                logger.debug(f"Fetching file: {file}")
-                log_audit("system", "READ", f"s3_file:{file}", "STARTED")
-                response = s3_client.get_object(S3_BUCKET_NAME, file)
-                file_content = response.read()
-                logger.debug(f"Processing file: {file} ({len(file_content)} bytes)")
-                df = process_csv_data(BytesIO(file_content))
-                if not df.empty:
-                    all_data.append(df)
-                    logger.debug(f"Processed {len(df)} rows from {file}")
-                    log_audit("system", "READ", f"s3_file:{file}", "SUCCESS", f"Processed {len(df)} rows")
-                else:
-                    logger.warning(f"Empty dataframe after processing {file}")
-                    log_audit("system", "READ", f"s3_file:{file}", "WARNING", "Empty dataframe after processing")
-                
-        except Exception as e:
-            logger.error(f"Error fetching data from MinIO: {str(e)}")
-            logger.error(traceback.format_exc())
-            log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "FAILURE", f"Error: {str(e)}")
-            return pd.DataFrame()
-    else:
-        # boto3 client (default case)
-        try:
+            remote_files = {obj.object_name: obj.etag for obj in objects if obj.object_name.endswith('.csv')}
+        else:
             logger.debug("Using boto3 client to list objects")
-            response = s3_client.list_objects_v2(Bucket=S3_BUCKET_NAME)
-            if 'Contents' not in response:
-                logger.warning(f"No contents found in bucket: {S3_BUCKET_NAME}")
-                log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "WARNING", "No contents found")
-                return pd.DataFrame()
-            
-            files = [item['Key'] for item in response['Contents'] if item['Key'].endswith('.csv')]
-            logger.info(f"Found {len(files)} CSV files in the bucket")
-            
-            all_data = []
-            for file in files:
-                logger.debug(f"Fetching file: {file}")
+            # Paginate: a bare list_objects_v2 call returns at most 1000
+            # keys and would silently drop data as the bucket grows
+            remote_files = {}
+            paginator = s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=S3_BUCKET_NAME):
+                for item in page.get('Contents', []):
+                    if item['Key'].endswith('.csv'):
+                        remote_files[item['Key']] = item['ETag']
+    except Exception as e:
+        logger.error(f"Error listing objects in S3 bucket: {str(e)}")
+        logger.error(traceback.format_exc())
+        log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "FAILURE", f"Error: {str(e)}")
+        return pd.DataFrame()
+
+    if not remote_files:
+        logger.warning(f"No CSV files found in bucket: {S3_BUCKET_NAME}")
+        log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "WARNING", "No contents found")
+        return pd.DataFrame()
+
+    logger.info(f"Found {len(remote_files)} CSV files in the bucket")
+
+    # Drop cached entries for files that are no longer in the bucket
+    for key in list(file_cache):
+        if key not in remote_files:
+            del file_cache[key]
+
+    # Download changed files concurrently; the blocking client calls run in
+    # worker threads so N files cost ~1 round-trip instead of N
+    to_fetch = [
+        file for file, etag in remote_files.items()
+        if file not in file_cache or file_cache[file][0] != etag
+    ]
+    try:
+        if to_fetch:
+            logger.debug(f"Fetching {len(to_fetch)} changed files concurrently")
+            for file in to_fetch:
                 log_audit("system", "READ", f"s3_file:{file}", "STARTED")
-                obj = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=file)
-                file_content = obj['Body'].read()
-                logger.debug(f"Processing file: {file} ({len(file_content)} bytes)")
-                df = process_csv_data(BytesIO(file_content))
+            fetched = await asyncio.gather(
+                *[asyncio.to_thread(_fetch_object_bytes, s3_client, file) for file in to_fetch]
+            )
+            # Parse in worker threads as well: pyarrow's reader releases the
+            # GIL, so the event loop keeps serving requests during a refresh
+            parsed = await asyncio.gather(
+                *[asyncio.to_thread(process_csv_data, BytesIO(content)) for content in fetched]
+            )
+            for file, file_content, df in zip(to_fetch, fetched, parsed):
+                logger.debug(f"Processed file: {file} ({len(file_content)} bytes)")
                 if not df.empty:
-                    all_data.append(df)
+                    file_cache[file] = (remote_files[file], df)
                     logger.debug(f"Processed {len(df)} rows from {file}")
                     log_audit("system", "READ", f"s3_file:{file}", "SUCCESS", f"Processed {len(df)} rows")
                 else:
                     logger.warning(f"Empty dataframe after processing {file}")
                     log_audit("system", "READ", f"s3_file:{file}", "WARNING", "Empty dataframe after processing")
-            
-        except Exception as e:
-            logger.error(f"Error fetching data from S3: {str(e)}")
-            logger.error(traceback.format_exc())
-            log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "FAILURE", f"Error: {str(e)}")
-            return pd.DataFrame()
-    
+    except Exception as e:
+        logger.error(f"Error fetching data from S3: {str(e)}")
+        logger.error(traceback.format_exc())
+        log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "FAILURE", f"Error: {str(e)}")
+        return pd.DataFrame()
+
+    all_data = [file_cache[file][1] for file in remote_files if file in file_cache]
+
     # Combine all data frames
     if not all_data:
         logger.warning("No valid data found in any files")
         log_audit("system", "READ", f"s3_bucket:{S3_BUCKET_NAME}", "WARNING", "No valid data found in any files")
         return pd.DataFrame()
-    
+
     combined_data = pd.concat(all_data, ignore_index=True)
+    # concat downgrades category columns to object when the per-file
+    # category sets differ, so restore the dtype on the combined frame
+    combined_data["PSTATEABB"] = combined_data["PSTATEABB"].astype("category")
     logger.info(f"Combined data has {len(combined_data)} rows")
     log_audit("system", "PROCESS", "combined_data", "SUCCESS", f"Combined {len(all_data)} files, {len(combined_data)} rows")
-    
-    # Update cache
+
+    # Update cache and persist the snapshot for future cold starts
     data_cache = combined_data
     data_cache_timestamp = current_time
+    _rebuild_plants_by_state(combined_data)
+    _write_parquet_snapshot(combined_data)
     logger.debug("Updated data cache")
-    
+
     return combined_data
 
 def process_csv_data(file_content: BytesIO) -> pd.DataFrame:
     """
     Process the CSV data from the GEN23 sheet
     """
+    required_columns = ["GENID", "PNAME", "PSTATEABB", "GENNTAN", "ORISPL"]
     try:
-        # Read CSV file
-        df = pd.read_csv(file_content, encoding='utf-8')
-        logger.debug(f"Read CSV with {len(df)} rows")
-        
-        # Check if required columns exist
-        required_columns = ["GENID", "PNAME", "PSTATEABB", "GENNTAN", "ORISPL"]
-        for col in required_columns:
-            if col not in df.columns:
-                logger.warning(f"Missing required column: {col}")
-                return pd.DataFrame()
-        
-        # Select only the columns we need
-        selected_df = df[required_columns].copy()
-        
+        # Parse with pyarrow's multithreaded CSV reader, restricted to the
+        # required columns so unneeded columns are skipped at tokenize time
+        try:
+            table = pacsv.read_csv(
+                file_content,
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=required_columns,
+                    column_types={"GENNTAN": pa.float64()},
+                ),
+            )
+        except pa.ArrowKeyError as e:
+            logger.warning(f"Missing required column: {str(e)}")
+            return pd.DataFrame()
+        except pa.ArrowInvalid:
+            # Non-numeric GENNTAN values; re-read as strings and coerce below
+            file_content.seek(0)
+            table = pacsv.read_csv(
+                file_content,
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=required_columns,
+                    column_types={"GENNTAN": pa.string()},
+                ),
+            )
+
+        # split_blocks keeps each column in its own block so numeric columns
+        # convert zero-copy where possible, and self_destruct releases the
+        # arrow buffers as they are consumed instead of holding both copies
+        selected_df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        logger.debug(f"Read CSV with {len(selected_df)} rows")
+
+        # Categorical state column: equality filters and unique() operate on
+        # integer codes instead of comparing Python strings row by row
+        selected_df["PSTATEABB"] = selected_df["PSTATEABB"].astype("category")
+
         # Clean data
         # Convert net generation to numeric, handling non-numeric values
-        selected_df["GENNTAN"] = pd.to_numeric(selected_df["GENNTAN"], errors="coerce")
-        
+        if selected_df["GENNTAN"].dtype == object:
+            selected_df["GENNTAN"] = pd.to_numeric(selected_df["GENNTAN"], errors="coerce")
+
         # Drop rows with missing values
         initial_rows = len(selected_df)
-        selected_df.dropna(subset=["GENNTAN", "PSTATEABB", "PNAME", "ORISPL"], inplace=True)
+        selected_df = selected_df.dropna(subset=["GENNTAN", "PSTATEABB", "PNAME", "ORISPL"])
         final_rows = len(selected_df)
         
         if initial_rows != final_rows:
@@ -9,6 +9,14 @@ def clean_dataframe(df):
     Clean the dataframe based on the provided Jupyter notebook logic
     """
     try:
+        # Skip the rename round-trip when the frame already carries the
+        # short API column names; convert_to_api_format projects those
+        # directly, so renaming them to verbose names and back is wasted work
+        api_names = {'GENID', 'PNAME', 'PSTATEABB', 'ORISPL', 'GENNTAN'}
+        if api_names.issubset(df.columns):
+            log_audit("system", "PROCESS", "clean_dataframe", "SUCCESS", f"Processed {len(df)} rows")
+            return df
+
         # Rename columns for clarity
         columns_mapping = {
             'SEQGEN23': 'Generator file sequence number',
@@ -53,11 +61,14 @@ def clean_dataframe(df):
 
 def clean_csv_data(file_content):
     """
-    Process and clean CSV data from uploaded file
+    Process and clean CSV data from an uploaded file.
+    Accepts a file-like object (e.g. the upload's spooled temp file) or bytes.
     """
     try:
-        # Read CSV file
-        df = pd.read_csv(BytesIO(file_content), encoding='utf-8')
+        # Read CSV file, streaming from the file object when given one
+        if isinstance(file_content, bytes):
+            file_content = BytesIO(file_content)
+        df = pd.read_csv(file_content, encoding='utf-8')
         
         # Clean the data
         cleaned_df = clean_dataframe(df)
@@ -71,11 +82,14 @@ def clean_csv_data(file_content):
 
 def clean_excel_data(file_content, sheet_name='GEN23'):
     """
-    Process and clean Excel data from uploaded file
+    Process and clean Excel data from an uploaded file.
+    Accepts a file-like object (e.g. the upload's spooled temp file) or bytes.
     """
     try:
-        # Read Excel file
-        df = pd.read_excel(BytesIO(file_content), sheet_name=sheet_name)
+        # Read Excel file, streaming from the file object when given one
+        if isinstance(file_content, bytes):
+            file_content = BytesIO(file_content)
+        df = pd.read_excel(file_content, sheet_name=sheet_name)
         log_audit("system", "PROCESS", f"excel_file:{sheet_name}", "STARTED")
         
         # Clean the data
@@ -103,7 +117,13 @@ def convert_to_api_format(df):
             'DOE/EIA ORIS plant or facility code': 'ORISPL',
             'Generator annual net generation (MWh)': 'GENNTAN'
         }
-        
+
+        # Fast path: the data already uses the short API column names
+        # (the common case for eGRID files), so just project the columns
+        # instead of renaming back and forth
+        if set(api_columns.values()).issubset(df.columns):
+            return df[list(api_columns.values())]
+
         # Create a new dataframe with only the needed columns
         api_df = pd.DataFrame()
         
@@ -1,94 +1,347 @@
+import atexit
+import functools
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import sys
 from pathlib import Path
 
-# Create logs directory if it doesn't exist
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+
+@functools.cache
+def _ensure_logs_dir() -> Path:
+    """
+    Create the logs directory once per process and return its path.
+    """
+    logs_dir = Path("logs")
+    logs_dir.mkdir(exist_ok=True)
+    return logs_dir
+
+
+# Configured loggers memoized per (name, level) so repeated get_logger calls
+# skip the handler setup entirely
+_logger_cache = {}
+
+# Per-request identifiers set by the request middleware. Contextvars make
+# them available to every log record without round-tripping through
+# request.state.
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+user_id_var: ContextVar[str] = ContextVar("user_id", default="anonymous")
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Inject the current request id into each record. Attached at the logger
+    level so it runs in the calling context, not the listener thread.
+    """
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+# Formatter shared by all file handlers
+file_formatter = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - [req:%(request_id)s] - %(message)s'
+)
+
+
+# Single worker shared by all file handlers so concurrent rollovers stay
+# serialized
+_roll_pool = ThreadPoolExecutor(max_workers=1)
+
+
+def _shift_backups(base_filename, backup_count, rolling_name):
+    """
+    Shift the numbered backups and slot the just-rotated file in as .1.
+    Runs on the rollover worker thread.
+    """
+    try:
+        if backup_count > 0:
+            for i in range(backup_count - 1, 0, -1):
+                sfn = "%s.%d" % (base_filename, i)
+                dfn = "%s.%d" % (base_filename, i + 1)
+                if os.path.exists(sfn):
+                    if os.path.exists(dfn):
+                        os.remove(dfn)
+                    os.rename(sfn, dfn)
+            dfn = base_filename + ".1"
+            if os.path.exists(dfn):
+                os.remove(dfn)
+            if os.path.exists(rolling_name):
+                os.rename(rolling_name, dfn)
+        elif os.path.exists(rolling_name):
+            os.remove(rolling_name)
+    except OSError:
+        # Never let a failed backup shuffle take down the writer
+        pass
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that only checks the file size every N records.
+
+    The stock handler runs shouldRollover on every emit, costing a size
+    lookup per record on the listener thread. Checking every 128 records
+    trades at most ~128 records of rollover slack for eliminating 99% of
+    those checks.
+
+    Rollover itself only does the cheap part inline (rename the full file
+    aside and reopen a fresh one); the backup cascade of renames runs on a
+    shared single-worker thread so the writer is not stalled by slow disks.
+    """
+    _check_every = 128
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._emit_count = 0
+        self._roll_seq = 0
+
+    def shouldRollover(self, record):
+        self._emit_count += 1
+        if self._emit_count % self._check_every:
+            return 0
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        # Unique name per rollover so a pending cascade for the previous
+        # one is never clobbered
+        self._roll_seq += 1
+        rolling_name = "%s.rolling.%d" % (self.baseFilename, self._roll_seq)
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, rolling_name)
+        if not self.delay:
+            self.stream = self._open()
+        _roll_pool.submit(_shift_backups, self.baseFilename, self.backupCount, rolling_name)
+
+
+class BufferedAppendFileHandler(logging.Handler):
+    """
+    Append-only file handler that batches formatted lines in memory.
+
+    The audit log is high-volume and write-once, so per-record size checks
+    are replaced with one check per flush. Records accumulate in a buffer
+    that is flushed with a single write once it reaches 64KB or a second
+    has passed since the last flush; a timer thread flushes any residue on
+    the same interval so a trailing record never waits in memory for the
+    next audit event. When a flush pushes the file past maxBytes it is
+    renamed aside and reopened, with the backup cascade running on the
+    shared rollover worker. Thread safety comes from the handler lock:
+    Handler.handle wraps emit in it, and flush takes it explicitly.
+    """
+    _max_buffer_bytes = 64 * 1024
+    _max_buffer_age = 1.0
+
+    def __init__(self, filename, maxBytes=0, backupCount=0):
+        super().__init__()
+        self.baseFilename = os.fspath(filename)
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        # Opened lazily on the first flush with content, matching the
+        # delay=True behaviour of the rotating handlers
+        self._file = None
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._last_flush = time.monotonic()
+        self._roll_seq = 0
+        self._closed = False
+        self._timer = None
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        self._timer = threading.Timer(self._max_buffer_age, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_flush(self):
+        self.flush()
+        self.acquire()
+        try:
+            if not self._closed:
+                self._schedule_flush()
+        finally:
+            self.release()
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + "\n"
+            self._buffer.append(line)
+            self._buffer_bytes += len(line)
+            now = time.monotonic()
+            if (
+                self._buffer_bytes >= self._max_buffer_bytes
+                or now - self._last_flush >= self._max_buffer_age
+            ):
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer:
+                if self._file is None:
+                    self._file = open(self.baseFilename, "a", encoding="utf-8")
+                if not self._file.closed:
+                    self._file.write("".join(self._buffer))
+                    self._file.flush()
+                    if self.maxBytes and self._file.tell() >= self.maxBytes:
+                        self._do_rollover()
+            self._buffer = []
+            self._buffer_bytes = 0
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+
+    def _do_rollover(self):
+        """
+        Rename the full file aside and drop the stream so the next flush
+        reopens a fresh one. Called under the handler lock from flush.
+        """
+        self._file.close()
+        self._file = None
+        # Unique name per rollover so a pending cascade for the previous
+        # one is never clobbered
+        self._roll_seq += 1
+        rolling_name = "%s.rolling.%d" % (self.baseFilename, self._roll_seq)
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, rolling_name)
+        _roll_pool.submit(_shift_backups, self.baseFilename, self.backupCount, rolling_name)
+
+    def close(self):
+        self.acquire()
+        try:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+        finally:
+            self.release()
+        try:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+        finally:
+            super().close()
+
+
+def _stop_listener(listener: QueueListener):
+    """
+    Stop a queue listener, tolerating one that was already stopped.
+    """
+    if getattr(listener, "_thread", None) is not None:
+        listener.stop()
 
 # Configure logger
 def get_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     """
     Configure and return a logger instance
-    
+
     Args:
         name: Name of the logger (usually the module name)
         log_level: Logging level (default: INFO)
-        
+
     Returns:
         Configured logger instance
     """
+    cache_key = (name, log_level)
+    cached = _logger_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     logger = logging.getLogger(name)
-    
+
     # Avoid adding handlers if they already exist
     if logger.hasHandlers():
+        _logger_cache[cache_key] = logger
         return logger
-        
+
+    logs_dir = _ensure_logs_dir()
     logger.setLevel(log_level)
-    
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    logger.addFilter(RequestContextFilter())
+
+    # Create formatter for console output
     console_formatter = logging.Formatter(
         '%(levelname)s - %(message)s'
     )
-    
+
     # Create console handler for logging to stderr
     console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(log_level)
     logger.addHandler(console_handler)
-    
+
     # Create file handler for error logs
-    error_file_handler = RotatingFileHandler(
+    error_file_handler = BatchedRotatingFileHandler(
         logs_dir / "error.log",
         maxBytes=10485760,  # 10MB
         backupCount=5,  # Keep 5 backup logs
+        delay=True,  # Open on first record, not at import
     )
     error_file_handler.setFormatter(file_formatter)
     error_file_handler.setLevel(logging.ERROR)
-    logger.addHandler(error_file_handler)
-    
+
     # Create file handler for all logs
-    all_file_handler = RotatingFileHandler(
+    all_file_handler = BatchedRotatingFileHandler(
         logs_dir / "app.log",
         maxBytes=10485760,  # 10MB
         backupCount=5,  # Keep 5 backup logs
+        delay=True,  # Open on first record, not at import
     )
     all_file_handler.setFormatter(file_formatter)
     all_file_handler.setLevel(log_level)
-    logger.addHandler(all_file_handler)
-    
-    # Create file handler for audit logs
-    audit_file_handler = RotatingFileHandler(
-        logs_dir / "audit.log",
-        maxBytes=10485760,  # 10MB
-        backupCount=5,  # Keep 5 backup logs
+
+    # File writes and rollover checks happen on a background listener
+    # thread; the emitting thread only pays for a queue put
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, error_file_handler, all_file_handler, respect_handler_level=True
     )
-    audit_file_handler.setFormatter(file_formatter)
-    audit_file_handler.setLevel(log_level)
-    # We don't add this handler to the logger as we'll use it separately
-    
-    return logger, audit_file_handler
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    logger.addHandler(QueueHandler(log_queue))
+
+    _logger_cache[cache_key] = logger
+    return logger
 
 # Create default logger instance
-logger, audit_handler = get_logger("power_plant_api")
+logger = get_logger("power_plant_api")
+
+# Audit events are enqueued and written by a background listener thread, so
+# callers never block on audit file I/O or rollover checks
+_audit_queue = queue.SimpleQueue()
+
+# Create file handler for audit logs
+audit_file_handler = BufferedAppendFileHandler(
+    _ensure_logs_dir() / "audit.log",
+    maxBytes=10485760,  # 10MB
+    backupCount=5,  # Keep 5 backup logs
+)
+audit_file_handler.setFormatter(file_formatter)
+audit_file_handler.setLevel(logging.INFO)
+
+_audit_listener = QueueListener(_audit_queue, audit_file_handler, respect_handler_level=True)
+_audit_listener.start()
+atexit.register(_stop_listener, _audit_listener)
 
 # Create specialized audit logger
 audit_logger = logging.getLogger("audit")
 if not audit_logger.handlers:
     audit_logger.setLevel(logging.INFO)
-    audit_logger.addHandler(audit_handler)
+    audit_logger.addFilter(RequestContextFilter())
+    audit_logger.addHandler(QueueHandler(_audit_queue))
     # Don't propagate to root logger to avoid duplicate logs
     audit_logger.propagate = False
 
 def log_audit(user_id: str, action: str, resource: str, status: str, details: str = None):
     """
     Log an audit event
-    
+
     Args:
         user_id: ID of the user performing the action
         action: Type of action (e.g., "READ", "CREATE", "UPDATE", "DELETE")
@@ -96,7 +349,17 @@ def log_audit(user_id: str, action: str, resource: str, status: str, details: st
         status: Status of the action (e.g., "SUCCESS", "FAILURE")
         details: Additional details about the action
     """
-    message = f"USER:{user_id} ACTION:{action} RESOURCE:{resource} STATUS:{status}"
+    # Skip string building entirely when audit logging is disabled, and
+    # defer %-formatting to the listener thread otherwise
+    if not audit_logger.isEnabledFor(logging.INFO):
+        return
     if details:
-        message += f" DETAILS:{details}"
-    audit_logger.info(message) 
\ No newline at end of file
+        audit_logger.info(
+            "USER:%s ACTION:%s RESOURCE:%s STATUS:%s DETAILS:%s",
+            user_id, action, resource, status, details,
+        )
+    else:
+        audit_logger.info(
+            "USER:%s ACTION:%s RESOURCE:%s STATUS:%s",
+            user_id, action, resource, status,
+        )
@@ -2,9 +2,12 @@
 """
 Script to check the contents of files in MinIO.
 """
-import io
-import pandas as pd
+import asyncio
+import sys
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from minio import Minio
+from minio.error import S3Error
 import os
 
 # S3 configuration
@@ -14,12 +17,38 @@ S3_SECRET_KEY = os.environ.get("S3_SECRET_KEY", "minioadmin")
 S3_BUCKET_NAME = os.environ.get("S3_BUCKET_NAME", "power-viz")
 S3_USE_SSL = os.environ.get("S3_USE_SSL", "False").lower() == "true"
 
-def main():
+def fetch_target_table(client: Minio, target_file: str):
+    """
+    Fetch the target file and parse it, or return None when it's missing.
+    """
+    # Check for the file with a single HEAD request instead of enumerating
+    # every object
+    try:
+        client.stat_object(S3_BUCKET_NAME, target_file)
+    except S3Error as e:
+        if e.code != "NoSuchKey":
+            raise
+        return None
+
+    # Stream the body into pyarrow's CSV reader; for a smoke check this
+    # avoids importing pandas (slow import, large RSS) entirely
+    response = client.get_object(S3_BUCKET_NAME, target_file)
+    try:
+        return pacsv.read_csv(response)
+    finally:
+        response.close()
+        response.release_conn()
+
+async def main(full: bool = False, list_objects: bool = False):
     """
     Main function to check MinIO contents.
+
+    Args:
+        full: Also print the first rows of the target file (imports pandas)
+        list_objects: Also walk and print every object in the bucket
     """
     print(f"Connecting to MinIO at {S3_ENDPOINT}")
-    
+
     # Create MinIO client
     client = Minio(
         S3_ENDPOINT,
@@ -27,47 +56,50 @@ def main():
         secret_key=S3_SECRET_KEY,
         secure=S3_USE_SSL,
     )
-    
-    # List all files in the bucket
-    print(f"Listing files in bucket: {S3_BUCKET_NAME}")
-    objects = list(client.list_objects(S3_BUCKET_NAME, recursive=True))
-    
-    if not objects:
-        print("No files found in the bucket.")
-        return
-    
-    for obj in objects:
-        print(f"Found file: {obj.object_name} ({obj.size} bytes)")
-    
-    # Check for the sample power plants file
+
     target_file = "cleaned_sample_power_plants.csv"
-    if any(obj.object_name == target_file for obj in objects):
-        print(f"\nRetrieving file: {target_file}")
-        
-        # Get the file
-        response = client.get_object(S3_BUCKET_NAME, target_file)
-        content = response.read()
-        
-        # Read into pandas
-        df = pd.read_csv(io.BytesIO(content))
-        
+
+    # Both the bucket walk and the target fetch are independent blocking
+    # calls; run them in worker threads and overlap them
+    fetch_task = asyncio.create_task(
+        asyncio.to_thread(fetch_target_table, client, target_file)
+    )
+
+    # The full bucket walk is O(objects); only do it when asked for
+    if list_objects:
+        print(f"Listing files in bucket: {S3_BUCKET_NAME}")
+        objects = await asyncio.to_thread(
+            lambda: list(client.list_objects(S3_BUCKET_NAME, recursive=True))
+        )
+        for obj in objects:
+            print(f"Found file: {obj.object_name} ({obj.size} bytes)")
+
+    table = await fetch_task
+
+    if table is not None:
+        print(f"\nRetrieved file: {target_file}")
+
         # Print info
-        print(f"\nFile contains {len(df)} rows")
+        print(f"\nFile contains {table.num_rows} rows")
         print("\nColumn names:")
-        print(df.columns.tolist())
-        
+        print(table.column_names)
+
         # Check states
-        if "PSTATEABB" in df.columns:
-            states = df["PSTATEABB"].unique().tolist()
+        if "PSTATEABB" in table.column_names:
+            states = pc.unique(table.column("PSTATEABB")).to_pylist()
             print(f"\nUnique states in file: {states}")
         else:
             print("\nNo PSTATEABB column found in the file!")
-        
-        # Print first few rows
-        print("\nFirst 5 rows:")
-        print(df.head())
+
+        if full:
+            # The pretty head dump is the only thing that needs pandas, so
+            # only pay for the import when asked
+            import pandas as pd  # noqa: F401
+
+            print("\nFirst 5 rows:")
+            print(table.slice(0, 5).to_pandas())
     else:
         print(f"\nFile not found: {target_file}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main(full="--full" in sys.argv[1:], list_objects="--list" in sys.argv[1:]))
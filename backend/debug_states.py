@@ -5,10 +5,14 @@ Script to debug and fix state retrieval issues.
 import os
 import io
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from minio import Minio
 import traceback
 import asyncio
 import sys
+import urllib3
+from urllib3.util.retry import Retry
 
 # Add the app directory to the path so we can import the modules
 sys.path.append("/app")
@@ -20,39 +24,57 @@ S3_SECRET_KEY = os.environ.get("S3_SECRET_KEY", "minioadmin")
 S3_BUCKET_NAME = os.environ.get("S3_BUCKET_NAME", "power-viz")
 S3_USE_SSL = os.environ.get("S3_USE_SSL", "False").lower() == "true"
 
+# Shared client so every call in the script reuses one TCP/TLS connection
+# pool instead of building a fresh urllib3 pool per call
+_minio_client = None
+
 def get_minio_client():
     """
-    Get a MinIO client.
+    Get the shared MinIO client, creating it on first use.
     """
-    return Minio(
-        S3_ENDPOINT,
-        access_key=S3_ACCESS_KEY,
-        secret_key=S3_SECRET_KEY,
-        secure=S3_USE_SSL,
-    )
+    global _minio_client
+    if _minio_client is None:
+        _minio_client = Minio(
+            S3_ENDPOINT,
+            access_key=S3_ACCESS_KEY,
+            secret_key=S3_SECRET_KEY,
+            secure=S3_USE_SSL,
+            http_client=urllib3.PoolManager(
+                maxsize=8,
+                retries=Retry(total=3, backoff_factor=0.1),
+            ),
+        )
+    return _minio_client
 
 def process_csv_data(file_content):
     """
     Process CSV data directly, similar to what the backend does.
+    Accepts a file-like object (e.g. a streaming MinIO response) or bytes.
     """
-    # Read CSV file
-    df = pd.read_csv(io.BytesIO(file_content))
-    print(f"Read CSV with {len(df)} rows and columns: {df.columns.tolist()}")
-    
-    # Check if required columns exist
+    if isinstance(file_content, bytes):
+        file_content = io.BytesIO(file_content)
+
+    # Parse with pyarrow's CSV reader restricted to the required columns,
+    # mirroring the backend's process_csv_data
     required_columns = ["GENID", "PNAME", "PSTATEABB", "GENNTAN", "ORISPL"]
-    for col in required_columns:
-        if col not in df.columns:
-            print(f"Missing required column: {col}")
-            return pd.DataFrame()
-    
-    # Select only the columns we need
-    selected_df = df[required_columns].copy()
-    
-    # Clean data
-    # Convert net generation to numeric, handling non-numeric values
-    selected_df["GENNTAN"] = pd.to_numeric(selected_df["GENNTAN"], errors="coerce")
-    
+    try:
+        table = pacsv.read_csv(
+            file_content,
+            convert_options=pacsv.ConvertOptions(
+                include_columns=required_columns,
+                column_types={"GENNTAN": pa.float64()},
+            ),
+        )
+    except pa.ArrowKeyError as e:
+        print(f"Missing required column: {e}")
+        return pd.DataFrame()
+    except pa.ArrowInvalid as e:
+        print(f"Could not parse CSV: {e}")
+        return pd.DataFrame()
+
+    selected_df = table.to_pandas()
+    print(f"Read CSV with {len(selected_df)} rows and columns: {selected_df.columns.tolist()}")
+
     # Drop rows with missing values
     initial_rows = len(selected_df)
     selected_df.dropna(subset=["GENNTAN", "PSTATEABB", "PNAME", "ORISPL"], inplace=True)
@@ -81,8 +103,8 @@ async def get_states_from_backend():
         
         # Get states
         if not data.empty:
-            states = data["PSTATEABB"].unique().tolist()
-            states.sort()
+            # Dedupe and sort in pandas' vectorized path instead of a Python list sort
+            states = data["PSTATEABB"].drop_duplicates().sort_values().tolist()
             print(f"States from backend function: {states}")
         else:
             print("No data returned from backend function")
@@ -98,18 +120,24 @@ async def fix_states_direct():
     try:
         client = get_minio_client()
         target_file = "cleaned_sample_power_plants.csv"
-        
-        # Get the file
-        response = client.get_object(S3_BUCKET_NAME, target_file)
-        content = response.read()
-        
-        # Process it
-        df = process_csv_data(content)
+
+        def fetch_and_parse():
+            # Get the file and stream it straight into the parser
+            response = client.get_object(S3_BUCKET_NAME, target_file)
+            try:
+                return process_csv_data(response)
+            finally:
+                response.close()
+                response.release_conn()
+
+        # The MinIO client and the parser both block; run them in a worker
+        # thread so the event loop stays free
+        df = await asyncio.to_thread(fetch_and_parse)
         
         # Get unique states
         if not df.empty:
-            states = df["PSTATEABB"].unique().tolist()
-            states.sort()
+            # Dedupe and sort in pandas' vectorized path instead of a Python list sort
+            states = df["PSTATEABB"].drop_duplicates().sort_values().tolist()
             print(f"States directly from file: {states}")
             
             # Now forcefully update the module's cache
@@ -118,17 +146,16 @@ async def fix_states_direct():
             # Try to access the module
             try:
                 import app.routes.power_plants
-                print(f"Current states_cache: {app.routes.power_plants.states_cache}")
-                
-                # Replace it
-                app.routes.power_plants.states_cache = states
-                print(f"Updated states_cache: {app.routes.power_plants.states_cache}")
-                
-                # Restart the FastAPI application
-                print("Restart the backend container for the changes to take effect.")
-                
+                print(f"Current states cache: {app.routes.power_plants.STATES_CACHE['states']}")
+
+                # Update the shared container in place so the change is
+                # visible to everything holding a reference to it
+                app.routes.power_plants.STATES_CACHE["states"] = states
+                app.routes.power_plants.STATES_CACHE["timestamp"] = None
+                print(f"Updated states cache: {app.routes.power_plants.STATES_CACHE['states']}")
+
             except Exception as e:
-                print(f"Error updating states_cache: {str(e)}")
+                print(f"Error updating states cache: {str(e)}")
                 traceback.print_exc()
         else:
             print("No data in the file")
@@ -143,21 +170,23 @@ async def main():
     """
     print("=== Debugging State Retrieval ===")
     
-    # Check file in MinIO
+    # Check file in MinIO; list_objects blocks, so push it to a thread
     client = get_minio_client()
     print(f"Listing files in bucket: {S3_BUCKET_NAME}")
-    objects = list(client.list_objects(S3_BUCKET_NAME, recursive=True))
-    
+    objects = await asyncio.to_thread(
+        lambda: list(client.list_objects(S3_BUCKET_NAME, recursive=True))
+    )
+
     if not objects:
         print("No files found in the bucket.")
         return
-    
+
     for obj in objects:
         print(f"Found file: {obj.object_name} ({obj.size} bytes)")
-    
+
     print("\n=== Getting States from Backend Function ===")
     await get_states_from_backend()
-    
+
     print("\n=== Fixing States Directly ===")
     await fix_states_direct()
 
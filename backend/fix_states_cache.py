@@ -4,7 +4,7 @@ Script to clear the states cache to force a refresh.
 """
 import sys
 import traceback
-from app.routes.power_plants import states_cache
+from app.routes.power_plants import STATES_CACHE
 from app.services import get_s3_client, get_data_from_s3
 from app.utils.logger import logger, log_audit
 import asyncio
@@ -13,15 +13,13 @@ async def fix_states_cache():
     """
     Clear and refresh the states cache.
     """
-    global states_cache
-    
     try:
-        print("Current states_cache value:", states_cache)
-        
-        # Clear the cache
+        print("Current states cache value:", STATES_CACHE["states"])
+
+        # Clear the cache in place so the module sees it
         print("Clearing states cache...")
-        from app.routes.power_plants import states_cache
-        states_cache = None
+        STATES_CACHE["states"] = None
+        STATES_CACHE["timestamp"] = None
         print("States cache cleared")
         
         # Fetch fresh data
@@ -34,11 +32,11 @@ async def fix_states_cache():
             return
         
         # Get unique states
-        states = data["PSTATEABB"].unique().tolist()
-        states.sort()
+        # Dedupe and sort in pandas' vectorized path instead of a Python list sort
+        states = data["PSTATEABB"].drop_duplicates().sort_values().tolist()
         
-        # Update cache manually
-        states_cache = states
+        # Update the shared container in place
+        STATES_CACHE["states"] = states
         
         print(f"States cache updated with {len(states)} states: {', '.join(states)}")
         log_audit("system", "UPDATE", "states_cache", "SUCCESS", f"Updated with {len(states)} states")
@@ -8,4 +8,20 @@ logs_dir.mkdir(exist_ok=True)
 
 if __name__ == "__main__":
     print("Starting Power Plant API server...")
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # Auto-reload is a development convenience that costs a file watcher and
+    # forces a single worker; opt into it instead of shipping it on
+    reload = os.environ.get("RELOAD", "0") == "1"
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=reload,
+        # uvloop and httptools replace the stdlib event loop and h11 parser
+        # with their C implementations
+        loop="uvloop",
+        http="httptools",
+        workers=1 if reload else int(os.environ.get("WORKERS", os.cpu_count() or 2)),
+        # The app configures its own logging pipeline; skip uvicorn's
+        # dictConfig pass
+        log_config=None,
+    )
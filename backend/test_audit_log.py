@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 """
-Test script to verify audit logging functionality.
+Test script to verify audit logging functionality and measure its throughput.
 """
-import time
+import logging
+import os
 import random
-from app.utils.logger import logger, log_audit
+import time
+from app.utils.logger import logger, log_audit, _audit_listener, _stop_listener
 
 def main():
     """
@@ -12,28 +14,40 @@ def main():
     """
     logger.info("Starting audit log test")
     print("Testing audit logging functionality...")
-    
+
     # Generate some test audit log entries
     users = ["admin", "user1", "user2", "anonymous"]
     actions = ["READ", "CREATE", "UPDATE", "DELETE", "LOGIN", "LOGOUT"]
     resources = ["user_profile", "dashboard", "settings", "report", "api_endpoint"]
     statuses = ["SUCCESS", "FAILURE", "WARNING", "PENDING"]
-    
-    # Log some random audit events
-    for i in range(10):
-        user = random.choice(users)
-        action = random.choice(actions)
-        resource = random.choice(resources)
-        status = random.choice(statuses)
-        details = f"Test audit log entry #{i+1}"
-        
-        log_audit(user, action, resource, status, details)
-        print(f"Created audit log: USER:{user} ACTION:{action} RESOURCE:{resource} STATUS:{status}")
-        time.sleep(0.5)
-    
-    logger.info("Audit log test completed")
+
+    # Draw all the random combinations up front with random.choices (one
+    # vectorized call per list) instead of four random.choice calls per
+    # iteration
+    n = int(os.environ.get("AUDIT_BENCH_N", "100000"))
+    combos = list(zip(
+        random.choices(users, k=n),
+        random.choices(actions, k=n),
+        random.choices(resources, k=n),
+        random.choices(statuses, k=n),
+    ))
+
+    # Time only the logging loop: this measures the caller-side cost of
+    # log_audit (filter, format args, queue put), which is what requests pay
+    start = time.perf_counter()
+    for i, (user, action, resource, status) in enumerate(combos):
+        log_audit(user, action, resource, status, f"Test audit log entry #{i+1}")
+    elapsed = time.perf_counter() - start
+
+    # Drain the listener queue and flush the handlers so every record is on
+    # disk before we report
+    _stop_listener(_audit_listener)
+    logging.shutdown()
+
+    print(f"Logged {n} audit records in {elapsed:.3f}s "
+          f"({n / elapsed:,.0f} records/sec enqueued)")
     print("\nTest completed. Check logs/audit.log for the audit entries.")
     print("Also check logs/app.log for application logs and logs/error.log for any errors.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
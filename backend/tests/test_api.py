@@ -1,11 +1,26 @@
 import pytest
-from fastapi.testclient import TestClient
+import httpx
+from httpx import ASGITransport
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import io
 from app.main import app
 
-client = TestClient(app)
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    # One ASGI-transport client for the whole session: requests run straight
+    # on the test event loop with no threaded portal in between
+    async with httpx.AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
 
 # Mock S3 client and data
 @pytest.fixture
@@ -13,9 +28,10 @@ def mock_s3_client():
     mock_client = MagicMock()
     return mock_client
 
-@pytest.fixture
-def mock_dataframe():
-    # Create a mock dataframe with sample data
+@pytest.fixture(scope="session")
+def _mock_dataframe_session():
+    # Create the mock dataframe once per session; construction from a
+    # dict-of-lists pays for column inference and index building
     data = {
         "GENID": ["GEN1", "GEN2", "GEN3", "GEN4", "GEN5"],
         "PNAME": ["Plant A", "Plant B", "Plant C", "Plant D", "Plant E"],
@@ -25,51 +41,61 @@ def mock_dataframe():
     }
     return pd.DataFrame(data)
 
-def test_root_endpoint():
+@pytest.fixture
+def mock_dataframe(_mock_dataframe_session):
+    # Hand out a cheap shallow copy so a mutating test can't leak changes
+    # into the session-scoped original
+    return _mock_dataframe_session.copy(deep=False)
+
+@pytest.mark.anyio
+async def test_root_endpoint(client):
     """Test that the root endpoint returns a welcome message"""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to the Power Plant API"}
 
-@patch('app.main.get_data_from_s3')
-def test_get_states(mock_get_data, mock_dataframe):
+@pytest.mark.anyio
+@patch('app.routes.power_plants.get_data_from_s3')
+async def test_get_states(mock_get_data, client, mock_dataframe):
     """Test getting states endpoint"""
     mock_get_data.return_value = mock_dataframe
-    
-    response = client.get("/states")
+
+    response = await client.get("/api/power-plants/states")
     assert response.status_code == 200
     assert sorted(response.json()) == ["CA", "NY", "TX"]
 
-@patch('app.main.get_data_from_s3')
-def test_get_plants(mock_get_data, mock_dataframe):
+@pytest.mark.anyio
+@patch('app.routes.power_plants.get_data_from_s3')
+async def test_get_plants(mock_get_data, client, mock_dataframe):
     """Test getting plants endpoint with state filter"""
     mock_get_data.return_value = mock_dataframe
-    
+
     # Test CA state
-    response = client.get("/plants?state=CA&limit=5")
+    response = await client.get("/api/power-plants/?state=CA&limit=5")
     assert response.status_code == 200
     plants = response.json()
     assert len(plants) == 2
-    
+
     # Verify the order (by net generation, descending)
     assert plants[0]["name"] == "Plant B"
     assert plants[0]["netGeneration"] == 25000.0
     assert plants[1]["name"] == "Plant A"
     assert plants[1]["netGeneration"] == 15000.0
-    
+
     # Test NY state with limit
-    response = client.get("/plants?state=NY&limit=1")
+    response = await client.get("/api/power-plants/?state=NY&limit=1")
     assert response.status_code == 200
     plants = response.json()
     assert len(plants) == 1
     assert plants[0]["name"] == "Plant D"
     assert plants[0]["netGeneration"] == 30000.0
 
-@patch('app.main.get_data_from_s3')
-def test_get_plants_nonexistent_state(mock_get_data, mock_dataframe):
+@pytest.mark.anyio
+@patch('app.routes.power_plants.get_data_from_s3')
+async def test_get_plants_nonexistent_state(mock_get_data, client, mock_dataframe):
     """Test getting plants for a state that doesn't exist in the data"""
     mock_get_data.return_value = mock_dataframe
-    
-    response = client.get("/plants?state=ZZ&limit=5")
+
+    response = await client.get("/api/power-plants/?state=ZZ&limit=5")
     assert response.status_code == 200
-    assert response.json() == [] 
\ No newline at end of file
+    assert response.json() == []